@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
 import asyncio
-import requests
+import logging
+import httpx
 import speedtest
 import time
-from ping3 import ping
+from collections import defaultdict
 from datetime import datetime, timedelta
 from sagemcom_api.client import SagemcomClient
 from sagemcom_api.enums import EncryptionMethod
-from prometheus_client import Gauge, Info, start_http_server
+from sagemcom_api.exceptions import (
+    AuthenticationException,
+    InvalidSessionException,
+    LoginTimeoutException,
+)
+from prometheus_client import Gauge, Info, REGISTRY, start_http_server
+from prometheus_client.core import GaugeMetricFamily, InfoMetricFamily
+from prometheus_client.registry import Collector
 import os  # For environment variables
 
+log = logging.getLogger("sagemcom_exporter")
+
 # ------------------------------------------------------------------------------
 # Environment variables or defaults
 # ------------------------------------------------------------------------------
@@ -31,22 +41,115 @@ device_uptime_gauge = Gauge('sagemcom_device_uptime_seconds', 'Uptime of the rou
 device_reboot_count_gauge = Gauge('sagemcom_device_reboot_count', 'Number of times the router has rebooted')
 connected_devices_gauge = Gauge('sagemcom_connected_devices', 'Number of active devices on the network')
 
-device_info_gauge = Gauge(
-    'sagemcom_connected_device_info',
-    'Detailed information about each connected device',
-    [
-        'device_id', 'device_name', 'ip', 'hostname', 'status',
-        'interface_type', 'lease_time_remaining', 'layer1_interface',
-        'layer3_interface', 'blacklist_status', 'blacklisted_schedule'
-    ]
-)
+# ------------------------------------------------------------------------------
+# Per-device metrics, built at scrape time from the last fetched host list
+# ------------------------------------------------------------------------------
+class DeviceInventoryCollector(Collector):
+    """
+    Exposes the connected devices from the most recent collection cycle.
+    Series only exist for devices in that list, so nothing goes stale and
+    there is no per-device gauge state to clear or evict.
+    """
 
-device_status_gauge = Gauge(
-    'sagemcom_device_status', 'Device active status', ['mac_address', 'name', 'hostname', 'interface']
-)
-device_lease_gauge = Gauge(
-    'sagemcom_device_lease', 'Device DHCP lease details', ['mac_address', 'metric']
-)
+    def __init__(self):
+        self.devices = []
+
+    def update(self, devices):
+        """
+        Store a new host list and return it deduplicated. Hosts without a MAC
+        are skipped and duplicates collapsed, preferring an active entry,
+        since metric families don't merge identical label sets the way
+        .labels() did.
+        """
+        by_mac = {}
+        for d in devices:
+            mac = d.id
+            if mac is not None and (mac not in by_mac or d.active):
+                by_mac[mac] = d
+        devices = list(by_mac.values())
+        self.devices = devices
+        return devices
+
+    def collect(self):
+        # Replaced wholesale by the collection loop, so take one reference
+        devices = self.devices
+
+        status = GaugeMetricFamily(
+            'sagemcom_device_status', 'Device active status',
+            labels=['mac_address', 'name', 'hostname', 'interface']
+        )
+        lease = GaugeMetricFamily(
+            'sagemcom_device_lease', 'Device DHCP lease details',
+            labels=['mac_address', 'metric']
+        )
+        # Keyed by the stable MAC only; the descriptive fields that can change
+        # (name, DHCP address, interface) live on the details info metric
+        info = GaugeMetricFamily(
+            'sagemcom_connected_device_info',
+            'Connected device, 1 when active',
+            labels=['device_id']
+        )
+        details = InfoMetricFamily(
+            'sagemcom_connected_device_details',
+            'Descriptive information about each connected device',
+            labels=['device_id']
+        )
+        blacklisted = GaugeMetricFamily(
+            'sagemcom_device_blacklisted', 'Device blacklist status (1=blacklisted)',
+            labels=['mac_address']
+        )
+        # Only devices that actually have a schedule get a series here
+        schedule_info = InfoMetricFamily(
+            'sagemcom_device_blacklisted_schedule', 'Blacklist schedule of a device',
+            labels=['mac_address']
+        )
+
+        for d in devices:
+            # Metric families don't stringify label values like .labels() does
+            mac = d.id
+            active_v = 1 if d.active else 0
+            host_name = d.host_name
+            interface_type = d.interface_type
+
+            # device status (1=active, 0=inactive)
+            status.add_metric([mac, str(d.name), str(host_name), str(interface_type)], active_v)
+
+            # lease details, skipping fields the router left empty: a None
+            # sample would fail the whole scrape
+            for metric, value in (
+                ('lease_start', d.lease_start),
+                ('lease_duration', d.lease_duration),
+                ('lease_remaining', d.lease_time_remaining),
+            ):
+                if value is not None:
+                    lease.add_metric([mac, metric], value)
+
+            # extended device info
+            info.add_metric([mac], active_v)
+            details.add_metric([mac], {
+                'device_name': d.alias or "unknown",
+                'ip': d.ip_address or "unknown",
+                'hostname': str(host_name or "unknown"),
+                'interface_type': interface_type or "unknown",
+                'layer1_interface': str(d.layer1_interface or "unknown"),
+                'layer3_interface': str(d.layer3_interface or "unknown")
+            })
+
+            # blacklist status (1=blacklisted, 0=allowed)
+            blacklisted.add_metric([mac], 1 if d.blacklisted else 0)
+            schedule = d.blacklisted_schedule
+            if schedule:
+                schedule_info.add_metric([mac], {'schedule': str(schedule)})
+
+        yield status
+        yield lease
+        yield info
+        yield details
+        yield blacklisted
+        yield schedule_info
+
+device_collector = DeviceInventoryCollector()
+REGISTRY.register(device_collector)
 
 # Static router info
 modem_info = Info('sagemcom_modem_info', 'Static information about the modem')
@@ -68,6 +171,8 @@ port_mapping_gauge = Gauge(
     'Details of NAT port mappings',
     ['external_port', 'internal_port', 'protocol', 'status']
 )
+# Status label values, indexed by the mapping's enabled flag
+_PORT_STATUS = ('inactive', 'active')
 
 # ------------------------------------------------------------------------------
 # Wi-Fi metric kinda works i guess
@@ -87,58 +192,185 @@ wifi_radio_channel_gauge = Gauge(
 # How often should speed test run, from my test once per hour or IP temp ban
 # ------------------------------------------------------------------------------
 speedtest_interval_seconds = 3600  # Default: run speedtest once per hour
-last_speedtest_time = 0
+_speedtest_lock = None
 last_pull_time = None
 next_pull_time = None
 
+# ------------------------------------------------------------------------------
+# Public IP rarely changes, only look it up hourly or after a router reboot
+# ------------------------------------------------------------------------------
+public_ip_refresh_seconds = 3600
+_public_ip_fetched_at = None  # time.monotonic() of the last successful lookup
+_last_uptime = None
+
+# Last values written to modem_info
+_last_modem_info = None
+
+# Shared HTTP/2 client for external calls (created inside the running loop)
+_http_client = None
+
+# Whether the long-lived router session is currently logged in
+_logged_in = False
+
+# Errors that mean the router session is gone and a fresh login may help
+_SESSION_ERRORS = (
+    InvalidSessionException,
+    AuthenticationException,
+    LoginTimeoutException,
+    ConnectionError,
+)
+
+# Cap on concurrent calls to the router's JSON-RPC API
+SAGEMCOM_MAX_CONCURRENT_CALLS = 4
+_sagemcom_semaphore = None
+
+# Label tuples written per labelled gauge in the previous cycle
+_prev_keys = defaultdict(set)
+
+# ------------------------------------------------------------------------------
+# Helper for dropping series that disappeared since the last cycle
+# ------------------------------------------------------------------------------
+def remove_stale_series(gauge, seen_keys):
+    """
+    Remove the series of `gauge` that were set last cycle but not in this one.
+    Unlike .clear(), series that are still present are never dropped, so a
+    scrape in the middle of a cycle does not see gaps.
+    """
+    for key in _prev_keys[gauge] - seen_keys:
+        gauge.remove(*key)
+    _prev_keys[gauge] = seen_keys
+
+# ------------------------------------------------------------------------------
+# Helper for bounding concurrent router calls
+# ------------------------------------------------------------------------------
+async def _limited(coro):
+    """
+    Await a router call while holding the shared semaphore, so fanning out
+    over more xpaths never floods the router with simultaneous requests.
+    """
+    global _sagemcom_semaphore
+    # Created lazily so it binds to the running loop
+    if _sagemcom_semaphore is None:
+        _sagemcom_semaphore = asyncio.Semaphore(SAGEMCOM_MAX_CONCURRENT_CALLS)
+    async with _sagemcom_semaphore:
+        return await coro
+
+
 # ------------------------------------------------------------------------------
 # Helper functions for getting public IP
 # ------------------------------------------------------------------------------
 async def fetch_public_ip():
-    """Fetch public IP using ipify."""
+    """Fetch public IP using ipify over the shared HTTP/2 client."""
     try:
-        resp = requests.get('https://api.ipify.org?format=json', timeout=5)
+        resp = await _http_client.get('https://api.ipify.org?format=json')
         resp.raise_for_status()
         return resp.json().get('ip')
     except Exception as e:
-        print(f"Error fetching public IP: {e}")
+        log.error("Error fetching public IP: %s", e, exc_info=True)
         return None
+
+def router_rebooted(device_info):
+    """Return True if the router uptime went backwards since the last cycle."""
+    return _last_uptime is not None and device_info.up_time < _last_uptime
+
+async def refresh_public_ip(device_info_task):
+    """
+    Update public_ip_info when the last lookup is older than the refresh
+    interval, or if the router rebooted (usually a new WAN lease). Only waits
+    for this cycle's device info when the reboot check is the sole reason
+    to look the IP up.
+    """
+    global _public_ip_fetched_at
+    last_fetch = _public_ip_fetched_at
+    if last_fetch is not None and time.monotonic() - last_fetch < public_ip_refresh_seconds:
+        try:
+            if not router_rebooted(await device_info_task):
+                return
+        except Exception:
+            return  # Logged by collect_sagemcom_metrics()
+
+    public_ip = await fetch_public_ip()
+    if public_ip:
+        _public_ip_fetched_at = time.monotonic()
+        public_ip_info.info({'public_ip': public_ip})
+
 # ------------------------------------------------------------------------------
 # The speedtest runnner
 # ------------------------------------------------------------------------------
+def _blocking_speedtest():
+    """Synchronous speedtest-cli run; returns (download Mbps, upload Mbps, ping ms)."""
+    st = speedtest.Speedtest()
+    st.get_best_server()
+    download_speed = st.download() / 1_000_000  # Mbps
+    upload_speed = st.upload() / 1_000_000      # Mbps
+    return download_speed, upload_speed, st.results.ping
+
 async def run_speedtest():
-    """Runs speed test and updates Prometheus metrics."""
-    try:
-        st = speedtest.Speedtest()
-        st.get_best_server()
-        download_speed = st.download() / 1_000_000  # Mbps
-        upload_speed = st.upload() / 1_000_000      # Mbps
-        ping_ms = st.results.ping
-
-        speedtest_download_gauge.set(download_speed)
-        speedtest_upload_gauge.set(upload_speed)
-        speedtest_ping_gauge.set(ping_ms)
-
-        print(
-            f"Speed Test - Download: {download_speed:.2f} Mbps, "
-            f"Upload: {upload_speed:.2f} Mbps, "
-            f"Ping: {ping_ms:.2f} ms"
-        )
-    except Exception as e:
-        print(f"Error running speed test: {e}")
+    """Runs speed test in a worker thread and updates Prometheus metrics."""
+    global _speedtest_lock
+    # Created lazily so it binds to the running loop
+    if _speedtest_lock is None:
+        _speedtest_lock = asyncio.Lock()
+    if _speedtest_lock.locked():
+        log.info("Speed test already running, skipping.")
+        return
+
+    async with _speedtest_lock:
+        try:
+            # speedtest-cli blocks for tens of seconds, keep it off the event loop
+            download_speed, upload_speed, ping_ms = await asyncio.to_thread(_blocking_speedtest)
+
+            speedtest_download_gauge.set(download_speed)
+            speedtest_upload_gauge.set(upload_speed)
+            speedtest_ping_gauge.set(ping_ms)
+
+            log.info(
+                "Speed Test - Download: %.2f Mbps, Upload: %.2f Mbps, Ping: %.2f ms",
+                download_speed, upload_speed, ping_ms
+            )
+        except Exception as e:
+            log.error("Error running speed test: %s", e, exc_info=True)
+
+async def speedtest_loop():
+    """
+    Runs the speed test on its own schedule, independent of the collection
+    loop, so a long test never delays the regular router polls.
+    """
+    while True:
+        started = time.monotonic()
+        await run_speedtest()
+        # Keep an even cadence regardless of how long the test took
+        elapsed = time.monotonic() - started
+        await asyncio.sleep(max(0, speedtest_interval_seconds - elapsed))
 
 async def ping_google():
-    """Pings google.com and updates result in ms."""
+    """
+    Measures latency to google.com as the time to open a TCP connection on
+    port 443, and updates result in ms. Unlike ICMP this needs no raw-socket
+    privileges, which containers usually don't have.
+    """
     try:
-        ping_time = ping('google.com', timeout=1)
-        if ping_time is not None:
-            google_ping_gauge.set(ping_time * 1000)
-            print(f"Ping to Google: {ping_time * 1000:.2f} ms")
-        else:
-            google_ping_gauge.set(float('nan'))
+        started = time.perf_counter()
+        _, writer = await asyncio.wait_for(asyncio.open_connection('google.com', 443), timeout=1)
+        ping_ms = (time.perf_counter() - started) * 1000
+        google_ping_gauge.set(ping_ms)
+        log.info("Ping to Google: %.2f ms", ping_ms)
+    except asyncio.TimeoutError:
+        # Expected while offline, like ping3 returning None before
+        log.warning("Ping to google.com timed out")
+        google_ping_gauge.set(float('nan'))
+        return
     except Exception as e:
-        print(f"Error pinging google.com: {e}")
+        log.error("Error pinging google.com: %s", e, exc_info=True)
         google_ping_gauge.set(float('nan'))
+        return
+
+    # The measurement is already recorded, a failed close must not discard it
+    try:
+        writer.close()
+        await writer.wait_closed()
+    except Exception as e:
+        log.warning("Error closing connection to google.com: %s", e)
 
 async def collect_port_mappings(client):
     """
@@ -147,26 +379,24 @@ async def collect_port_mappings(client):
     adjust keys below accordingly.
     """
     try:
-        port_mappings = await client.get_value_by_xpath("Device/NAT/PortMappings")
-        port_mapping_gauge.clear()
-        if not port_mappings:
-            return
+        port_mappings = await _limited(client.get_value_by_xpath("Device/NAT/PortMappings"))
+        seen = set()
 
-        for mapping in port_mappings:
+        for mapping in port_mappings or []:
             # Adjust the dict keys if your device uses different names
             external_port = mapping.get('external_port', 'unknown')
             internal_port = mapping.get('internal_port', 'unknown')
             protocol = mapping.get('protocol', 'unknown')
-            enabled = 'active' if mapping.get('enabled', False) else 'inactive'
-
-            port_mapping_gauge.labels(
-                external_port=external_port,
-                internal_port=internal_port,
-                protocol=protocol,
-                status=enabled
-            ).set(1)
+            enabled = _PORT_STATUS[bool(mapping.get('enabled', False))]
+
+            # (external_port, internal_port, protocol, status)
+            key = (external_port, internal_port, protocol, enabled)
+            port_mapping_gauge.labels(*key).set(1)
+            seen.add(key)
+
+        remove_stale_series(port_mapping_gauge, seen)
     except Exception as e:
-        print(f"Error collecting port mappings: {e}")
+        log.error("Error collecting port mappings: %s", e, exc_info=True)
 
 # ------------------------------------------------------------------------------
 # Helper function for Wi-Fi stats
@@ -177,14 +407,12 @@ async def collect_wifi_stats(client: SagemcomClient):
     You MUST adjust the path/fields to match your router's firmware.
     """
     try:
-        wifi_radios = await client.get_value_by_xpath("Device/WiFi/Radios")
+        wifi_radios = await _limited(client.get_value_by_xpath("Device/WiFi/Radios"))
         if not wifi_radios:
-            print("No Wi-Fi radios found or path not supported.")
+            log.info("No Wi-Fi radios found or path not supported.")
             return
 
-        # Clear old values to avoid stale data
-        wifi_radio_signal_gauge.clear()
-        wifi_radio_channel_gauge.clear()
+        seen = set()
 
         # Suppose `wifi_radios` is a list of dicts, each describing a radio
         for i, radio in enumerate(wifi_radios):
@@ -195,150 +423,167 @@ async def collect_wifi_stats(client: SagemcomClient):
             # Update Prometheus
             wifi_radio_signal_gauge.labels(radio_index=i).set(signal_dbm)
             wifi_radio_channel_gauge.labels(radio_index=i).set(channel)
+            seen.add((i,))
+
+        # Drop radios that are no longer reported
+        remove_stale_series(wifi_radio_signal_gauge, seen)
+        remove_stale_series(wifi_radio_channel_gauge, set(seen))
 
     except Exception as e:
-        print(f"Error collecting Wi-Fi stats: {e}")
+        log.error("Error collecting Wi-Fi stats: %s", e, exc_info=True)
 
 # ------------------------------------------------------------------------------
 # Main metrics collection
 # ------------------------------------------------------------------------------
-async def collect_sagemcom_metrics():
+async def collect_sagemcom_metrics(client: SagemcomClient):
     """
     Collects all Sagemcom metrics: device info, DHCP leases, port mappings, etc.
+    Raises if the router calls failed so the caller can renew the session.
     """
-    global last_pull_time, next_pull_time
-
-    async with SagemcomClient(
-        HOST,
-        USERNAME,
-        PASSWORD,
-        ENCRYPTION_METHOD,
-        verify_ssl=VALIDATE_SSL_CERT
-    ) as client:
+    global last_pull_time, next_pull_time, _last_uptime, _last_modem_info
+
+    # --------------------------------------------------
+    # 1) Fire the independent calls concurrently
+    # --------------------------------------------------
+    # Port mappings / Wi-Fi stats / public IP update their own metrics.
+    # Comment out Wi-Fi if your router does not have it.
+    # Router calls go through _limited() to cap concurrent JSON-RPC requests.
+    dev_info_t = asyncio.create_task(_limited(client.get_device_info()))
+    hosts_t = asyncio.create_task(_limited(client.get_hosts()))
+    ports_t = asyncio.create_task(collect_port_mappings(client))
+    wifi_t = asyncio.create_task(collect_wifi_stats(client))
+    pubip_t = asyncio.create_task(refresh_public_ip(dev_info_t))
+    device_info, devices, _, _, _ = await asyncio.gather(
+        dev_info_t, hosts_t, ports_t, wifi_t, pubip_t,
+        return_exceptions=True
+    )
+
+    # --------------------------------------------------
+    # 2) Original device info (using .get_device_info())
+    # --------------------------------------------------
+    if isinstance(device_info, Exception):
+        # No traceback here, collect_with_relogin() logs it when this is re-raised
+        log.error("Error retrieving device info: %s", device_info)
+    else:
+        # Only updated after the gather, so refresh_public_ip() can compare
+        # this cycle's uptime against the previous one
+        _last_uptime = device_info.up_time
+        log.info("Device ID: %s", device_info.mac_address)
+        log.info("Build Date: %s", device_info.build_date)
+        log.info("Uptime: %s", device_info.up_time)
+        log.info("Reboot count: %s", device_info.reboot_count)
+        log.info("Model Name: %s", device_info.model_name)
+        log.info("Serial Number: %s", device_info.serial_number)
+        log.info("Software Version: %s", device_info.software_version)
+
+        # Update Prometheus
+        device_uptime_gauge.set(device_info.up_time)
+        device_reboot_count_gauge.set(device_info.reboot_count)
+        new_modem_info = {
+            'device_id': device_info.mac_address,
+            'build_date': device_info.build_date,
+            'model_name': device_info.model_name,
+            'serial_number': device_info.serial_number,
+            'software_version': device_info.software_version
+        }
+        # Static info, so only touch the metric when something changed
+        if new_modem_info != _last_modem_info:
+            modem_info.info(new_modem_info)
+            _last_modem_info = new_modem_info
+
+    # --------------------------------------------------
+    # 3) DHCP clients / connected devices
+    # --------------------------------------------------
+    if isinstance(devices, Exception):
+        log.error("Error retrieving connected devices: %s", devices)
+    else:
+        # Device series are generated from this list at scrape time; count
+        # from the same deduplicated list so it matches sagemcom_device_status
+        devices = device_collector.update(devices)
+        active_devices = [d for d in devices if d.active]
+        connected_devices_gauge.set(len(active_devices))
+
+    # Let the caller decide whether to log in again, surfacing a session
+    # error first if both router calls failed
+    errors = [r for r in (device_info, devices) if isinstance(r, Exception)]
+    if errors:
+        raise next((e for e in errors if isinstance(e, _SESSION_ERRORS)), errors[0])
+
+    # Logging of pull times
+    last_pull_time = datetime.now()
+    next_pull_time = last_pull_time + timedelta(seconds=COLLECTION_INTERVAL)
+    log.info("Last metrics pull: %s", last_pull_time)
+    log.info("Next metrics pull: %s", next_pull_time)
+
+
+async def collect_with_relogin(client: SagemcomClient):
+    """
+    Collects metrics over the long-lived router session, logging in only when
+    needed. On session or connection errors, logs out and back in and retries
+    once; any other error is logged and the cycle ends.
+    """
+    global _logged_in
+    for attempt in (1, 2):
         try:
-            # 1) Login
-            await client.login()
-
-            # --------------------------------------------------
-            # 2) Original device info (using .get_device_info())
-            # --------------------------------------------------
-            device_info = await client.get_device_info()
-            print(f"Device ID: {device_info.mac_address}")
-            print(f"Build Date: {device_info.build_date}")
-            print(f"Uptime: {device_info.up_time}")
-            print(f"Reboot count: {device_info.reboot_count}")
-            print(f"Model Name: {device_info.model_name}")
-            print(f"Serial Number: {device_info.serial_number}")
-            print(f"Software Version: {device_info.software_version}")
-
-            # Update Prometheus
-            device_uptime_gauge.set(device_info.up_time)
-            device_reboot_count_gauge.set(device_info.reboot_count)
-            modem_info.info({
-                'device_id': device_info.mac_address,
-                'build_date': device_info.build_date,
-                'model_name': device_info.model_name,
-                'serial_number': device_info.serial_number,
-                'software_version': device_info.software_version
-            })
-
-            # --------------------------------------------------
-            # 3) DHCP clients / connected devices
-            # --------------------------------------------------
-            devices = await client.get_hosts()
-            active_devices = [d for d in devices if d.active]
-            connected_devices_gauge.set(len(active_devices))
-
-            # Clear old device metrics
-            device_status_gauge.clear()
-            device_lease_gauge.clear()
-            device_info_gauge.clear()
-
-            for d in devices:
-                # device status (1=active, 0=inactive)
-                device_status_gauge.labels(
-                    mac_address=d.id,
-                    name=d.name,
-                    hostname=d.host_name,
-                    interface=d.interface_type
-                ).set(1 if d.active else 0)
-
-                # lease details
-                device_lease_gauge.labels(mac_address=d.id, metric='lease_start').set(d.lease_start)
-                device_lease_gauge.labels(mac_address=d.id, metric='lease_duration').set(d.lease_duration)
-                device_lease_gauge.labels(mac_address=d.id, metric='lease_remaining').set(d.lease_time_remaining)
-
-                # extended device info
-                device_info_gauge.labels(
-                    device_id=d.phys_address or "unknown",
-                    device_name=d.alias or "unknown",
-                    ip=d.ip_address or "unknown",
-                    hostname=d.host_name or "unknown",
-                    status="Active" if d.active else "Inactive",
-                    interface_type=d.interface_type or "unknown",
-                    lease_time_remaining=str(d.lease_time_remaining),
-                    layer1_interface=d.layer1_interface or "unknown",
-                    layer3_interface=d.layer3_interface or "unknown",
-                    blacklist_status="True" if d.blacklisted else "False",
-                    blacklisted_schedule=str(d.blacklisted_schedule or [])
-                ).set(1 if d.active else 0)
-
-            # --------------------------------------------------
-            # 4) Port Mappings
-            # --------------------------------------------------
-            await collect_port_mappings(client)
-
-            # --------------------------------------------------
-            # 5) Wi-Fi Stats (NEW)
-            # --------------------------------------------------
-            # Comment out if not relevant or if your router does not have Wi-Fi
-            await collect_wifi_stats(client)
-
-            # --------------------------------------------------
-            # 6) Public IP
-            # --------------------------------------------------
-            public_ip = await fetch_public_ip()
-            if public_ip:
-                public_ip_info.info({'public_ip': public_ip})
-
-            # Logging of pull times
-            last_pull_time = datetime.now()
-            next_pull_time = last_pull_time + timedelta(seconds=COLLECTION_INTERVAL)
-            print(f"Last metrics pull: {last_pull_time}")
-            print(f"Next metrics pull: {next_pull_time}")
-
+            if not _logged_in:
+                await client.login()
+                _logged_in = True
+            await collect_sagemcom_metrics(client)
+            return
+        except _SESSION_ERRORS as ex:
+            log.error("Router session error (attempt %d): %s", attempt, ex, exc_info=True)
+            if _logged_in:
+                try:
+                    await client.logout()
+                except Exception:
+                    pass  # Session is most likely gone already
+                _logged_in = False
         except Exception as ex:
-            print(f"An error occurred while retrieving data: {ex}")
+            log.error("An error occurred while retrieving data: %s", ex, exc_info=True)
+            return
 
 # ------------------------------------------------------------------------------
-# Loop to periodically collect metrics, ping Google, run Speedtest
+# Loop to periodically collect metrics and ping Google (Speedtest runs beside it)
 # ------------------------------------------------------------------------------
 async def update_metrics_loop():
-    global last_speedtest_time
-    while True:
-        # 1) Collect router metrics
-        await collect_sagemcom_metrics()
-
-        # 2) Ping Google
-        await ping_google()
-
-        # 3) Possibly run Speedtest (e.g. once per hour)
-        current_time = time.time()
-        if current_time - last_speedtest_time >= speedtest_interval_seconds:
-            await run_speedtest()
-            last_speedtest_time = current_time
-
-        # Sleep until next iteration
-        await asyncio.sleep(COLLECTION_INTERVAL)
+    global _http_client
+    # The client is reused across cycles; over HTTP/2 concurrent requests to
+    # the same host share one TLS connection instead of opening new ones.
+    _http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=5.0,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+    )
+    speedtest_task = asyncio.create_task(speedtest_loop())
+    try:
+        # One router session for the whole run, instead of a login per cycle
+        async with SagemcomClient(
+            HOST,
+            USERNAME,
+            PASSWORD,
+            ENCRYPTION_METHOD,
+            verify_ssl=VALIDATE_SSL_CERT
+        ) as client:
+            while True:
+                # Collect router metrics and ping Google side by side
+                await asyncio.gather(collect_with_relogin(client), ping_google())
+
+                # Sleep until next iteration
+                await asyncio.sleep(COLLECTION_INTERVAL)
+    finally:
+        speedtest_task.cancel()
+        await _http_client.aclose()
 
 # ------------------------------------------------------------------------------
 # Main
 # ------------------------------------------------------------------------------
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
     # Start Prometheus server
     start_http_server(SERVER_PORT)
-    print(f"Prometheus exporter started on port {SERVER_PORT}.")
-    print(f"Scraping every {COLLECTION_INTERVAL} seconds.")
+    log.info("Prometheus exporter started on port %d.", SERVER_PORT)
+    log.info("Scraping every %d seconds.", COLLECTION_INTERVAL)
 
     # Run asyncio event loop
     asyncio.run(update_metrics_loop())